@@ -5,7 +5,9 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
+import redis.asyncio as redis
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -17,17 +19,46 @@ load_dotenv()
 
 _client = None
 db = None
+_async_client = None
+async_db = None
+# Optional read-through cache; stays None when REDIS_URL is not set
+cache = None
 
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
+redis_url = os.getenv("REDIS_URL")
 
-if database_url and database_name:
-    _client = MongoClient(database_url)
-    db = _client[database_name]
+def connect():
+    """Open the MongoDB (sync + async) and Redis clients once per process.
+
+    Call from the app's startup hook (or a script's entry point) rather than at
+    import, so forked/spawned server workers never share connection pools.
+    """
+    global _client, db, _async_client, async_db, cache
+    if database_url and database_name and _client is None:
+        _client = MongoClient(database_url)
+        db = _client[database_name]
+        _async_client = AsyncIOMotorClient(database_url, maxPoolSize=100)
+        async_db = _async_client[database_name]
+    if redis_url and cache is None:
+        # short timeouts: an unreachable cache must fall back to Mongo quickly, not stall SOS sends
+        cache = redis.from_url(redis_url, socket_connect_timeout=0.2, socket_timeout=0.2)
+
+async def close():
+    """Close the clients opened by connect()"""
+    global _client, db, _async_client, async_db, cache
+    if _client is not None:
+        _client.close()
+        _async_client.close()
+        _client = db = _async_client = async_db = None
+    if cache is not None:
+        await cache.aclose()
+        cache = None
 
 # Helper functions for common database operations
 def create_document(collection_name: str, data: Union[BaseModel, dict]):
     """Insert a single document with timestamp"""
+    connect()
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
@@ -43,8 +74,26 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     result = db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
+async def create_document_async(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp without blocking the event loop"""
+    if async_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    # Convert Pydantic model to dict if needed
+    if isinstance(data, BaseModel):
+        data_dict = data.model_dump()
+    else:
+        data_dict = data.copy()
+
+    data_dict['created_at'] = datetime.now(timezone.utc)
+    data_dict['updated_at'] = datetime.now(timezone.utc)
+
+    result = await async_db[collection_name].insert_one(data_dict)
+    return str(result.inserted_id)
+
 def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
+    connect()
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
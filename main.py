@@ -1,15 +1,32 @@
+import asyncio
+import functools
+import logging
+import math
 import os
 import secrets
+import time
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+import httpx
+import numpy as np
+import orjson
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, EmailStr, Field
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from redis.exceptions import RedisError
 
-from database import db, create_document, get_documents
-from schemas import User, Report, Session
+import scorer
+import database
+from database import create_document_async
+from schemas import VALID_POINT_FILTER, User, Report, Session
 
-app = FastAPI(title="SheSecure API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="SheSecure API", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,9 +39,204 @@ app.add_middleware(
 # -------------------- Utility --------------------
 
 def collection(name: str):
-    if db is None:
+    if database.async_db is None:
         raise HTTPException(status_code=500, detail="Database not configured")
-    return db[name]
+    return database.async_db[name]
+
+def id_filter(doc_id: str) -> dict:
+    """Match an _id stored either as an ObjectId or as a plain string in one query"""
+    candidates = [doc_id]
+    try:
+        candidates.append(ObjectId(doc_id))
+    except (InvalidId, TypeError):
+        pass
+    return {"_id": {"$in": candidates}}
+
+USER_CACHE_TTL = 60
+
+async def find_user(user_id: str) -> Optional[dict]:
+    """Fetch a user (with _id as str), served from Redis when configured"""
+    key = f"u:{user_id}"
+    if database.cache is not None:
+        try:
+            cached = await database.cache.get(key)
+            if cached is not None:
+                return orjson.loads(cached)
+        except RedisError:
+            pass
+    u = await collection("user").find_one(id_filter(user_id))
+    if u is None:
+        return None
+    u["_id"] = str(u.get("_id"))
+    if database.cache is not None:
+        try:
+            await database.cache.setex(key, USER_CACHE_TTL, orjson.dumps(u))
+        except RedisError:
+            pass
+    return u
+
+async def forget_user(user_id: str):
+    if database.cache is not None:
+        try:
+            await database.cache.delete(f"u:{user_id}")
+        except RedisError:
+            pass
+
+# Every report as contiguous columns: lat/lng in radians and cos(lat), all float32,
+# and severity (int8, 1-5). Everything per-report the kernel needs is precomputed
+# here, so a request only converts its own midpoint.
+# New reports are appended in place by add_report_row. Every REPORTS_CACHE_TTL seconds
+# a single background reload reconciles with Mongo (e.g. other workers' writes) while
+# requests keep scoring against the current columns; only the very first load is awaited.
+# Above REPORTS_CACHE_MAX_ROWS reports the columns are not kept and "cols" stays None.
+REPORTS_CACHE_TTL = 30
+REPORTS_CACHE_MAX_ROWS = int(os.getenv("REPORTS_CACHE_MAX_ROWS", 200_000))
+_reports_cache = {"cols": None, "count": 0, "ts": 0, "loaded": False}
+# one reload at a time, whether it is the initial load or a background refresh
+_reports_lock = asyncio.Lock()
+_reports_refresh = None
+
+async def get_report_columns() -> Optional[tuple]:
+    """Return cached (lat_r, lng_r, cos_lat, sev) columns, or None when the collection is too large"""
+    global _reports_refresh
+    if time.time() - _reports_cache["ts"] > REPORTS_CACHE_TTL:
+        if not _reports_cache["loaded"]:
+            async with _reports_lock:
+                # another request may have finished the first load while this one waited
+                if not _reports_cache["loaded"]:
+                    await reload_report_columns()
+        elif _reports_refresh is None or _reports_refresh.done():
+            _reports_refresh = asyncio.create_task(refresh_report_columns())
+    return _reports_cache["cols"]
+
+async def refresh_report_columns():
+    try:
+        async with _reports_lock:
+            await reload_report_columns()
+    except Exception:
+        # keep serving the current columns; the next request past the TTL retries
+        logger.exception("Background reload of the report cache failed")
+
+def add_report_row(lat: float, lng: float, severity: int):
+    """Append a newly written report to the cached columns"""
+    _reports_cache["count"] += 1
+    cols = _reports_cache["cols"]
+    if cols is None:
+        # not loaded yet, or too many reports to cache: the next reload picks it up
+        return
+    lat_r = math.radians(lat)
+    row = (lat_r, math.radians(lng), math.cos(lat_r), severity)
+    _reports_cache["cols"] = tuple(
+        np.append(col, np.array([value], dtype=col.dtype)) for col, value in zip(cols, row)
+    )
+    assess_cached_route.cache_clear()
+
+# Malformed legacy reports are skipped rather than scored (or crashing the reload)
+SCORABLE_REPORT_FILTER = {
+    **VALID_POINT_FILTER,
+    "$or": [{"severity": None}, {"severity": {"$type": "number", "$gte": 1, "$lte": 5}}],
+}
+
+async def reload_report_columns():
+    count = await collection("report").estimated_document_count()
+    _reports_cache["count"] = count
+    if count > REPORTS_CACHE_MAX_ROWS:
+        _reports_cache["cols"] = None
+    else:
+        # stream straight into columns sized from the (estimated) count
+        size = count + 64
+        lats = np.empty(size, dtype=np.float32)
+        lngs = np.empty(size, dtype=np.float32)
+        sev = np.empty(size, dtype=np.int8)
+        n = 0
+        cursor = collection("report").find(
+            SCORABLE_REPORT_FILTER, {"_id": 0, "lat": 1, "lng": 1, "severity": 1}
+        ).batch_size(500)
+        async for r in cursor:
+            if n == size:
+                size *= 2
+                lats, lngs, sev = np.resize(lats, size), np.resize(lngs, size), np.resize(sev, size)
+            lats[n] = r["lat"]
+            lngs[n] = r["lng"]
+            sev[n] = r.get("severity") or 1
+            n += 1
+        lats, lngs, sev = lats[:n].copy(), lngs[:n].copy(), sev[:n].copy()
+        np.radians(lats, out=lats)
+        np.radians(lngs, out=lngs)
+        _reports_cache["cols"] = (lats, lngs, np.cos(lats), sev)
+        assess_cached_route.cache_clear()
+    _reports_cache["ts"] = time.time()
+    _reports_cache["loaded"] = True
+
+async def aggregate_report_counts(mid_lat: float, mid_lng: float) -> tuple:
+    """Same counts as scorer.score, computed by Mongo over the 2dsphere index"""
+    pipeline = [
+        {"$geoNear": {
+            "near": {"type": "Point", "coordinates": [mid_lng, mid_lat]},
+            "distanceField": "d",
+            "maxDistance": scorer.NEARBY_RADIUS_KM * 1000,
+            "spherical": True,
+        }},
+        {"$group": {
+            "_id": None,
+            "unsafe": {"$sum": {"$cond": [{"$lt": ["$d", scorer.UNSAFE_RADIUS_KM * 1000]}, {"$ifNull": ["$severity", 1]}, 1]}},
+            "nearby": {"$sum": 1},
+        }},
+    ]
+    res = await collection("report").aggregate(pipeline).to_list(1)
+    if not res:
+        return 0, _reports_cache["count"]
+    return res[0]["unsafe"], max(0, _reports_cache["count"] - res[0]["nearby"])
+
+@app.on_event("startup")
+async def startup():
+    # clients are opened here so each uvicorn worker process gets its own pool
+    global _http
+    database.connect()
+    if _http is None:
+        _http = httpx.AsyncClient(timeout=10)
+    if database.async_db is not None:
+        try:
+            await asyncio.wait_for(database.async_db.command("ping"), timeout=5)
+            await ensure_indexes()
+            await detect_capped_reports()
+            await get_report_columns()
+        except Exception as e:
+            # boot degraded rather than not at all; /test reports database health
+            logger.warning("Database setup skipped at startup: %s", e)
+    # compile the scoring kernel now rather than on the first route-safety request
+    scorer.warm_up()
+
+async def create_unique_user_index(field: str):
+    # every worker runs this hook, so fixing existing data lives in migrate_indexes.py
+    try:
+        await database.async_db.user.create_index(field, unique=True)
+    except OperationFailure as e:
+        if e.code == 85:  # IndexOptionsConflict: the index was created before it was unique
+            logger.warning("user.%s_1 is not unique; run migrate_indexes.py", field)
+        elif e.code == 11000:  # existing users share a value
+            logger.warning("Duplicate user %s values block the unique index; run migrate_indexes.py", field)
+        else:
+            raise
+
+async def ensure_indexes():
+    adb = database.async_db
+    await adb.user.create_index([("email", 1), ("phone", 1)])
+    await create_unique_user_index("email")
+    await create_unique_user_index("phone")
+    await adb.session.create_index("token", unique=True)
+    await adb.report.create_index([("created_at", -1)])
+    # reports written before Report.location existed are backfilled by migrate_indexes.py
+    await adb.report.create_index([("location", "2dsphere")])
+
+# Latest-first order for /api/reports. A capped report collection (see
+# migrate_capped_reports.py) is already in insertion order, so no sort stage is needed.
+_report_list_sort = [("created_at", -1)]
+
+async def detect_capped_reports():
+    global _report_list_sort
+    if (await database.async_db.report.options()).get("capped"):
+        _report_list_sort = [("$natural", -1)]
 
 # -------------------- Auth & Profiles --------------------
 
@@ -36,7 +248,7 @@ class LoginRequest(BaseModel):
 class SignupRequest(BaseModel):
     name: str
     phone: str
-    email: str
+    email: EmailStr
     address: Optional[str] = None
     state: Optional[str] = None
     emergency_contacts: List[str] = []
@@ -48,36 +260,33 @@ class SessionResponse(BaseModel):
     user_id: str
 
 @app.post("/api/login", response_model=SessionResponse)
-def login(payload: LoginRequest):
-    users = list(collection("user").find({"email": payload.email, "phone": payload.phone}))
+async def login(payload: LoginRequest):
+    users = await collection("user").find({"email": payload.email, "phone": payload.phone}).to_list(1)
     if not users:
         raise HTTPException(status_code=404, detail="Account not found. Please create an account.")
     user = users[0]
-    token = secrets.token_hex(16)
-    create_document("session", {"user_id": str(user.get("_id")), "token": token})
+    token = secrets.token_urlsafe(24)
+    await create_document_async("session", {"user_id": str(user.get("_id")), "token": token})
     return {"token": token, "user_id": str(user.get("_id"))}
 
 @app.post("/api/signup", response_model=SessionResponse)
-def signup(payload: SignupRequest):
-    # prevent duplicate email/phone
-    exists = collection("user").find_one({"$or": [{"email": payload.email}, {"phone": payload.phone}]})
-    if exists:
+async def signup(payload: SignupRequest):
+    # payload was validated at the boundary; skip a second validation pass
+    user = User.model_construct(**payload.model_dump())
+    # duplicate email/phone are rejected by the unique indexes
+    try:
+        user_id = await create_document_async("user", user)
+    except DuplicateKeyError:
         raise HTTPException(status_code=400, detail="User with this email or phone already exists")
-    user = User(**payload.model_dump())
-    user_id = create_document("user", user)
-    token = secrets.token_hex(16)
-    create_document("session", {"user_id": user_id, "token": token})
+    token = secrets.token_urlsafe(24)
+    await create_document_async("session", {"user_id": user_id, "token": token})
     return {"token": token, "user_id": user_id}
 
 @app.get("/api/profile/{user_id}")
-def get_profile(user_id: str):
-    u = collection("user").find_one({"_id": {"$oid": user_id}})
-    # Fallback when ObjectId helper not available in this runtime: try direct string match stored earlier
-    if not u:
-        u = collection("user").find_one({"_id": user_id}) or collection("user").find_one({"_id": {"$in": [user_id]}})
+async def get_profile(user_id: str):
+    u = await find_user(user_id)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
-    u["_id"] = str(u.get("_id"))
     return u
 
 class UpdateProfile(BaseModel):
@@ -89,44 +298,68 @@ class UpdateProfile(BaseModel):
     language: Optional[str] = None
 
 @app.put("/api/profile/{user_id}")
-def update_profile(user_id: str, payload: UpdateProfile):
+async def update_profile(user_id: str, payload: UpdateProfile):
     data = {k: v for k, v in payload.model_dump().items() if v is not None}
-    res = collection("user").update_one({"_id": user_id}, {"$set": data})
+    res = await collection("user").update_one(id_filter(user_id), {"$set": data})
     if res.matched_count == 0:
-        # try alt matching
-        res = collection("user").update_one({"_id": {"$oid": user_id}}, {"$set": data})
-        if res.matched_count == 0:
-            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=404, detail="User not found")
+    await forget_user(user_id)
     return {"updated": True}
 
 @app.delete("/api/profile/{user_id}")
-def delete_account(user_id: str):
-    collection("user").delete_one({"_id": user_id})
-    collection("user").delete_many({"user_id": user_id})
+async def delete_account(user_id: str):
+    await collection("user").delete_one(id_filter(user_id))
+    await collection("user").delete_many({"user_id": user_id})
+    await forget_user(user_id)
     return {"deleted": True}
 
 # -------------------- Unsafe Reports --------------------
 
 class ReportRequest(BaseModel):
-    lat: float
-    lng: float
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
     description: Optional[str] = None
     photo_url: Optional[str] = None
-    severity: int = 1
+    severity: int = Field(1, ge=1, le=5)
     user_id: Optional[str] = None
 
 @app.post("/api/report")
-def create_report(payload: ReportRequest):
-    report_id = create_document("report", Report(**payload.model_dump()))
+async def create_report(payload: ReportRequest):
+    report_id = await create_document_async("report", Report.model_construct(**payload.model_dump()))
+    add_report_row(payload.lat, payload.lng, payload.severity)
     return {"id": report_id}
 
+# fields the report list displays; photo_url, user_id and location stay in Mongo
+REPORT_LIST_FIELDS = {"lat": 1, "lng": 1, "severity": 1, "created_at": 1, "description": 1}
+
 @app.get("/api/reports")
-def list_reports(lat: Optional[float] = None, lng: Optional[float] = None, radius_km: float = 5):
-    # naive: return last 200 reports. A proper geo query would use geo indexes.
-    docs = list(collection("report").find().sort("created_at", -1).limit(200))
-    for d in docs:
+async def list_reports(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(5, gt=0),
+):
+    if lat is not None and lng is not None:
+        # latest 200 reports within radius_km, resolved through the 2dsphere index
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "distanceField": "distance",
+                "maxDistance": radius_km * 1000,
+                "spherical": True,
+            }},
+            {"$sort": {"created_at": -1}},
+            {"$limit": 200},
+            {"$project": {**REPORT_LIST_FIELDS, "distance": 1}},
+        ]
+        cursor = collection("report").aggregate(pipeline, batchSize=200)
+    else:
+        cursor = collection("report").find({}, REPORT_LIST_FIELDS).sort(_report_list_sort).limit(200).batch_size(200)
+    docs = []
+    async for d in cursor:
         d["_id"] = str(d.get("_id"))
-    return docs
+        docs.append(d)
+    # already plain dicts: serialize directly instead of through jsonable_encoder
+    return ORJSONResponse(docs)
 
 # -------------------- Routing & Safety --------------------
 
@@ -135,12 +368,46 @@ class RouteQuery(BaseModel):
     destination: List[float]
     timestamp: Optional[int] = None
 
+# Indexed by how many of the 0.25 / 0.5 score thresholds were cleared
+SAFETY_LEVELS = ("dangerous", "moderate", "safe")
+
+# Every reasons combination, keyed on (late hours, many unsafe reports, crowded)
+REASONS = {
+    (late, unsafe, crowded): tuple(
+        text for flag, text in (
+            (late, "Late hours reduce safety"),
+            (unsafe, "Multiple unsafe reports nearby"),
+            (crowded, "Crowded places increase safety"),
+        ) if flag
+    )
+    for late in (False, True)
+    for unsafe in (False, True)
+    for crowded in (False, True)
+}
+
+def assess_route(unsafe_reports: int, safe_reports: int, time_factor: float) -> tuple:
+    """Turn report counts into (score, safety, reasons)"""
+    poi_density = max(0.0, min(1.0, (safe_reports % 20) / 20))  # fake signal 0..1
+    sr_norm = max(0.0, min(1.0, safe_reports / 50))
+    ur_norm = max(0.0, min(1.0, unsafe_reports / 50))
+
+    score = (0.6 * poi_density + 0.3 * sr_norm - 0.5 * ur_norm) * time_factor
+    safety = SAFETY_LEVELS[(score >= 0.25) + (score >= 0.5)]
+    return score, safety, REASONS[time_factor < 1, ur_norm > 0.2, poi_density > 0.5]
+
+@functools.lru_cache(maxsize=4096)
+def assess_cached_route(mid_lat: float, mid_lng: float, time_factor: float) -> tuple:
+    """assess_route over the cached report columns; cleared whenever they reload.
+
+    Callers round the midpoint to 3 decimals (~100 m) so nearby queries share entries.
+    """
+    unsafe_reports, safe_reports = scorer.score(*_reports_cache["cols"], mid_lat, mid_lng)
+    return assess_route(unsafe_reports, safe_reports, time_factor)
+
 @app.post("/api/route-safety")
-def route_safety(payload: RouteQuery):
+async def route_safety(payload: RouteQuery):
     # Placeholder for external API integration: Google Places/Maps could be called here.
     # We'll simulate POI density using nearby reports and time of day component.
-    import math, time
-
     now = payload.timestamp or int(time.time())
     hour = (now // 3600) % 24
     time_factor = 0.7 if hour >= 20 or hour <= 5 else 1.0
@@ -149,40 +416,22 @@ def route_safety(payload: RouteQuery):
     mid_lat = (payload.origin[0] + payload.destination[0]) / 2
     mid_lng = (payload.origin[1] + payload.destination[1]) / 2
 
-    reports = list(collection("report").find())
-    unsafe_reports = 0
-    safe_reports = 0
-    for r in reports:
-        d = math.hypot((r.get("lat", 0) - mid_lat), (r.get("lng", 0) - mid_lng))
-        if d < 0.05:  # approx ~5km depending on latitude (rough)
-            s = int(r.get("severity", 1))
-            unsafe_reports += s
-        elif d < 0.1:
-            unsafe_reports += 1
-        else:
-            safe_reports += 1
-
-    poi_density = max(0.0, min(1.0, (safe_reports % 20) / 20))  # fake signal 0..1
-    sr_norm = max(0.0, min(1.0, safe_reports / 50))
-    ur_norm = max(0.0, min(1.0, unsafe_reports / 50))
-
-    score = (0.6 * poi_density + 0.3 * sr_norm - 0.5 * ur_norm) * time_factor
-    safety = "safe" if score >= 0.5 else ("moderate" if score >= 0.25 else "dangerous")
-
-    reason = []
-    if time_factor < 1:
-        reason.append("Late hours reduce safety")
-    if ur_norm > 0.2:
-        reason.append("Multiple unsafe reports nearby")
-    if poi_density > 0.5:
-        reason.append("Crowded places increase safety")
+    cols = await get_report_columns()
+    if cols is None:
+        counts = await aggregate_report_counts(mid_lat, mid_lng)
+        score, safety, reason = assess_route(*counts, time_factor)
+    elif not cols[0].size:
+        # no reports yet: nothing to scan
+        score, safety, reason = assess_route(0, 0, time_factor)
+    else:
+        score, safety, reason = assess_cached_route(round(mid_lat, 3), round(mid_lng, 3), time_factor)
 
     # Return a mocked polyline path (straight line) for demo
-    path = [
+    path = (
         {"lat": payload.origin[0], "lng": payload.origin[1]},
         {"lat": mid_lat, "lng": mid_lng},
         {"lat": payload.destination[0], "lng": payload.destination[1]},
-    ]
+    )
 
     return {
         "score": score,
@@ -200,13 +449,38 @@ class SOSRequest(BaseModel):
     lat: float
     lng: float
 
+# Twilio's REST API is plain HTTP basic auth, so one pooled client serves every SOS.
+# Opened in the startup hook alongside the database clients.
+_http = None
+
+@app.on_event("shutdown")
+async def close_clients():
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+    await database.close()
+
+# Twilio settings are resolved once at import; None means SOS texts are simulated
+_twilio = None
+_twilio_sid = os.getenv("TWILIO_ACCOUNT_SID")
+_twilio_token = os.getenv("TWILIO_AUTH_TOKEN")
+_twilio_from = os.getenv("TWILIO_PHONE_NUMBER")
+if _twilio_sid and _twilio_token and _twilio_from:
+    _twilio = {
+        "url": f"https://api.twilio.com/2010-04-01/Accounts/{_twilio_sid}/Messages.json",
+        "auth": httpx.BasicAuth(_twilio_sid, _twilio_token),
+        "from": _twilio_from,
+    }
+
+async def send_twilio_sms(to: str, body: str) -> str:
+    res = await _http.post(_twilio["url"], auth=_twilio["auth"], data={"From": _twilio["from"], "To": to, "Body": body})
+    res.raise_for_status()
+    return res.json()["sid"]
+
 @app.post("/api/sos")
-def send_sos(payload: SOSRequest):
+async def send_sos(payload: SOSRequest):
     # Integrate Twilio if credentials available, else simulate success
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-    from_number = os.getenv("TWILIO_PHONE_NUMBER")
-
     message = (
         f"⚠️ EMERGENCY ALERT! {payload.name} needs help immediately. "
         f"Current location: https://maps.google.com/?q={payload.lat},{payload.lng}. "
@@ -214,46 +488,48 @@ def send_sos(payload: SOSRequest):
     )
 
     # Fetch user's emergency contacts
-    u = collection("user").find_one({"_id": payload.user_id}) or collection("user").find_one({"_id": {"$oid": payload.user_id}})
+    u = await find_user(payload.user_id)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
     contacts = u.get("emergency_contacts", [])[:4]
 
     sent_to = []
-    if account_sid and auth_token and from_number:
-        try:
-            from twilio.rest import Client  # type: ignore
-            client = Client(account_sid, auth_token)
-            for c in contacts:
-                c = str(c)
-                if not c:
-                    continue
-                res = client.messages.create(body=message, from_=from_number, to=c)
-                sent_to.append({"to": c, "sid": res.sid})
-        except Exception as e:
-            # Fall back to simulated send
-            sent_to = [{"to": c, "sid": "simulated"} for c in contacts]
+    if _twilio is not None:
+        contacts = [str(c) for c in contacts if str(c)]
+        # send to every contact at once rather than one round trip after another
+        results = await asyncio.gather(
+            *[send_twilio_sms(c, message) for c in contacts],
+            return_exceptions=True,
+        )
+        for c, res in zip(contacts, results):
+            if isinstance(res, Exception):
+                logger.error("SOS text to %s failed: %r", c, res)
+                sent_to.append({"to": c, "sid": None, "error": "send failed"})
+            else:
+                sent_to.append({"to": c, "sid": res})
     else:
         # Simulate sending in this environment
         sent_to = [{"to": c, "sid": "simulated"} for c in contacts]
 
-    return {"ok": True, "sent": sent_to, "message": message}
+    ok = all(entry["sid"] for entry in sent_to)
+    return {"ok": ok, "sent": sent_to, "message": message}
 
 # -------------------- Health --------------------
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "SheSecure backend is running"}
 
 @app.get("/test")
 def test_database():
+    # Kept synchronous: FastAPI runs it in the threadpool, so the blocking pymongo call is fine here
     response = {
         "backend": "✅ Running",
-        "database": "❌ Not Available" if db is None else "✅ Connected",
+        "database": "❌ Not Available" if database.db is None else "✅ Connected",
     }
     try:
-        if db is not None:
-            response["collections"] = db.list_collection_names()
+        if database.db is not None:
+            response["collections"] = database.db.list_collection_names()
     except Exception as e:
         response["database"] = f"⚠️ {str(e)[:60]}"
     return response
@@ -261,4 +537,11 @@ def test_database():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+    )
@@ -0,0 +1,43 @@
+"""
+One-time migration: turn the report collection into a capped collection
+
+A capped collection keeps documents in insertion order, so the latest reports
+can be read with a reverse $natural scan instead of a sort on created_at.
+The oldest reports are dropped once the cap is reached.
+
+Run with the API stopped:  python migrate_capped_reports.py
+Indexes are removed by the conversion; the API recreates them on startup.
+"""
+
+import database
+from schemas import LOCATION_BACKFILL_FILTER
+
+REPORT_CAP_BYTES = 100 * 1024 * 1024
+REPORT_CAP_DOCS = 100_000
+
+def main():
+    database.connect()
+    db = database.db
+    if db is None:
+        raise SystemExit("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    if "report" not in db.list_collection_names():
+        db.create_collection("report", capped=True, size=REPORT_CAP_BYTES, max=REPORT_CAP_DOCS)
+        print("Created capped report collection")
+        return
+
+    if db.report.options().get("capped"):
+        print("report is already capped")
+        return
+
+    # Documents in a capped collection cannot grow, so add GeoJSON points first
+    db.report.update_many(
+        LOCATION_BACKFILL_FILTER,
+        [{"$set": {"location": {"type": "Point", "coordinates": ["$lng", "$lat"]}}}],
+    )
+    # convertToCapped only accepts a size; older documents beyond it are discarded
+    db.command("convertToCapped", "report", size=REPORT_CAP_BYTES)
+    print("Converted report to a capped collection")
+
+if __name__ == "__main__":
+    main()
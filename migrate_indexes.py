@@ -0,0 +1,53 @@
+"""
+One-time migration: bring existing data in line with the indexes the API expects
+
+- Backfills GeoJSON `location` on legacy reports so they appear in geo queries.
+- Rebuilds a non-unique `phone_1` user index as unique and creates the unique
+  `email_1` index (signup relies on both). Duplicate users are reported first and
+  nothing is dropped or created until they are resolved.
+
+These steps rewrite data or drop an index, so they run once from here rather than
+in the API's startup hook, which every server worker runs concurrently.
+
+Run with the API stopped:  python migrate_indexes.py
+"""
+
+import database
+from schemas import LOCATION_BACKFILL_FILTER
+
+def main():
+    database.connect()
+    db = database.db
+    if db is None:
+        raise SystemExit("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    res = db.report.update_many(
+        LOCATION_BACKFILL_FILTER,
+        [{"$set": {"location": {"type": "Point", "coordinates": ["$lng", "$lat"]}}}],
+    )
+    print(f"Backfilled location on {res.modified_count} reports")
+
+    duplicates = {field: find_duplicates(db, field) for field in ("email", "phone")}
+    if any(duplicates.values()):
+        for field, groups in duplicates.items():
+            for g in groups:
+                print(f"Duplicate {field} {g['_id']!r}: user ids {', '.join(str(i) for i in g['ids'])}")
+        raise SystemExit("Resolve the duplicate users above, then run this script again.")
+
+    phone_index = db.user.index_information().get("phone_1")
+    if phone_index is not None and not phone_index.get("unique"):
+        db.user.drop_index("phone_1")
+        print("Dropped non-unique phone_1 index")
+    db.user.create_index("phone", unique=True)
+    db.user.create_index("email", unique=True)
+    print("email_1 and phone_1 indexes are unique")
+
+def find_duplicates(db, field: str) -> list:
+    """Groups of users sharing a value of field, as {_id: value, ids: [...]}"""
+    return list(db.user.aggregate([
+        {"$group": {"_id": f"${field}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]))
+
+if __name__ == "__main__":
+    main()
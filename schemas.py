@@ -4,7 +4,7 @@ Database Schemas for SheSecure
 Each Pydantic model maps to a MongoDB collection (class name lowercased).
 """
 from typing import List, Optional
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, computed_field
 
 class User(BaseModel):
     """
@@ -26,12 +26,27 @@ class Report(BaseModel):
     Collection: report
     """
     user_id: Optional[str] = Field(None, description="Reporter user id")
-    lat: float
-    lng: float
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
     description: Optional[str] = None
     photo_url: Optional[str] = None
     severity: int = Field(1, ge=1, le=5, description="1-5 where 5 is most severe")
 
+    @computed_field(description="GeoJSON point ([lng, lat]) backing the 2dsphere index")
+    @property
+    def location(self) -> dict:
+        return {"type": "Point", "coordinates": [self.lng, self.lat]}
+
+# Reports whose lat/lng are numeric and in range; malformed legacy documents exist
+VALID_POINT_FILTER = {
+    "lat": {"$type": "number", "$gte": -90, "$lte": 90},
+    "lng": {"$type": "number", "$gte": -180, "$lte": 180},
+}
+
+# Legacy reports that can become a valid GeoJSON point; anything else would make the
+# 2dsphere index build fail, so it is left without a location
+LOCATION_BACKFILL_FILTER = {"location": {"$exists": False}, **VALID_POINT_FILTER}
+
 class Session(BaseModel):
     """
     Simple session mapping for demo (email/phone -> user id)
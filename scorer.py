@@ -0,0 +1,51 @@
+"""
+Route safety scoring kernel
+
+Counts reports around a point in one pass over the cached report columns.
+"""
+import math
+
+import numpy as np
+from numba import njit
+
+EARTH_RADIUS_KM = 6371.0
+UNSAFE_RADIUS_KM = 5.0
+NEARBY_RADIUS_KM = 10.0
+
+# Radii expressed as the haversine term a = sin²(d / 2R), so the kernel compares
+# against them directly instead of taking sqrt/arcsin per report
+UNSAFE_HAV = math.sin(UNSAFE_RADIUS_KM / (2 * EARTH_RADIUS_KM)) ** 2
+NEARBY_HAV = math.sin(NEARBY_RADIUS_KM / (2 * EARTH_RADIUS_KM)) ** 2
+
+@njit(cache=True)
+def score(lat_r, lng_r, cos_lat, sev, mid_lat, mid_lng):
+    """Return (unsafe_reports, safe_reports) around (mid_lat, mid_lng).
+
+    lat_r/lng_r are report coordinates in radians with cos_lat = cos(lat_r)
+    precomputed; mid_lat/mid_lng are in degrees. Distances are great-circle.
+    Rows with a NaN coordinate are skipped. fastmath stays off because it lets
+    NaN comparisons come out true.
+    """
+    lat0 = math.radians(mid_lat)
+    lng0 = math.radians(mid_lng)
+    cos0 = math.cos(lat0)
+    unsafe = 0
+    safe = 0
+    for i in range(lat_r.shape[0]):
+        s_lat = math.sin((lat_r[i] - lat0) * 0.5)
+        s_lng = math.sin((lng_r[i] - lng0) * 0.5)
+        a = s_lat * s_lat + cos_lat[i] * cos0 * s_lng * s_lng
+        if math.isnan(a):
+            continue
+        if a < UNSAFE_HAV:
+            unsafe += int(sev[i])
+        elif a < NEARBY_HAV:
+            unsafe += 1
+        else:
+            safe += 1
+    return unsafe, safe
+
+def warm_up():
+    """Compile (or load from cache) the kernel for the cached column dtypes."""
+    empty = np.empty(0, dtype=np.float32)
+    score(empty, empty, empty, np.empty(0, dtype=np.int8), 0.0, 0.0)